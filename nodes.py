@@ -1,7 +1,11 @@
 import os
 import json
+import hashlib
 import requests
 import time
+import threading
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from PIL import Image
 import numpy as np
@@ -35,6 +39,13 @@ os.makedirs(TOKEN_DIR, exist_ok=True)
 CONFIG_FILE = os.path.join(TOKEN_DIR, "thread_config.json")
 URL_CONFIG_FILE = os.path.join(TOKEN_DIR, "url.json")
 
+# 並行 API 請求的最大數量
+MAX_CONCURRENT_REQUESTS = 8
+
+# Threads 輪播項目數量限制
+CAROUSEL_MIN_ITEMS = 2
+CAROUSEL_MAX_ITEMS = 20
+
 def load_base_url():
     """讀取基礎 URL 配置"""
     if os.path.exists(URL_CONFIG_FILE):
@@ -49,6 +60,373 @@ def save_base_url(base_url):
     with open(URL_CONFIG_FILE, 'w', encoding='utf-8') as f:
         json.dump(url_config, f, ensure_ascii=False, indent=2)
 
+# 外部圖片網址檢查設定
+URL_CHECK_TTL = 3600  # 檢查成功結果快取秒數
+URL_CHECK_FAILURE_TTL = 60  # 明確失敗（4xx、類型、大小）結果快取秒數
+URL_CHECK_TIMEOUT = 10  # 單次檢查逾時秒數
+URL_SLOW_THRESHOLD = 5  # 回應超過此秒數視為緩慢來源
+IMAGE_MAX_BYTES = 8 * 1024 * 1024  # Threads 圖片大小上限 8MB
+IMAGE_CONTENT_TYPES = ("image/jpeg", "image/png")
+REHOST_MAX_DOWNLOAD_BYTES = 4 * IMAGE_MAX_BYTES  # 重新託管時最多下載的大小，過大的圖片會重新壓縮
+
+_url_check_cache = {}
+_url_check_lock = threading.Lock()
+
+def check_image_url(url):
+    """
+    以 HEAD（必要時改用 Range GET）檢查圖片網址的狀態碼、類型與大小。
+    成功結果快取 URL_CHECK_TTL 秒，明確失敗只快取 URL_CHECK_FAILURE_TTL 秒，
+    連線錯誤、逾時與 5xx/429 等暫時性失敗不快取。
+    """
+    now = time.time()
+    with _url_check_lock:
+        cached = _url_check_cache.get(url)
+    if cached and now - cached["checked_at"] < cached["ttl"]:
+        print(f"使用快取的網址檢查結果: {url}")
+        return cached
+
+    result = {"url": url, "ok": False, "error": None, "slow": False, "checked_at": now, "ttl": URL_CHECK_FAILURE_TTL}
+    transient = False
+    start = time.time()
+    try:
+        resp = requests.head(url, allow_redirects=True, timeout=URL_CHECK_TIMEOUT)
+        content_type = resp.headers.get("Content-Type", "")
+        size = resp.headers.get("Content-Length")
+
+        # 部分伺服器不支援 HEAD 或不回傳完整資訊，改用只取 1 byte 的 Range GET
+        if resp.status_code >= 400 or not content_type or size is None:
+            resp = requests.get(
+                url,
+                headers={"Range": "bytes=0-0"},
+                allow_redirects=True,
+                stream=True,
+                timeout=URL_CHECK_TIMEOUT,
+            )
+            resp.close()
+            content_type = resp.headers.get("Content-Type", "")
+            content_range = resp.headers.get("Content-Range", "")
+            if "/" in content_range:
+                size = content_range.rsplit("/", 1)[1]
+            elif resp.status_code == 200:
+                size = resp.headers.get("Content-Length")
+            else:
+                size = None
+
+        content_type = content_type.split(";")[0].strip().lower()
+        size = int(size) if size and str(size).isdigit() else None
+
+        if resp.status_code >= 400:
+            result["error"] = f"HTTP {resp.status_code}"
+            transient = resp.status_code >= 500 or resp.status_code == 429
+        elif content_type not in IMAGE_CONTENT_TYPES:
+            result["error"] = f"不支援的內容類型: {content_type or '未知'}"
+        elif size is not None and size > IMAGE_MAX_BYTES:
+            result["error"] = f"圖片過大: {size / (1024 * 1024):.2f} MB"
+        else:
+            result["ok"] = True
+            result["ttl"] = URL_CHECK_TTL
+    except Exception as e:
+        result["error"] = str(e)
+        transient = True
+
+    result["slow"] = time.time() - start > URL_SLOW_THRESHOLD
+
+    if not transient:
+        with _url_check_lock:
+            _url_check_cache[url] = result
+    return result
+
+def rehost_image_url(url, base_url):
+    """下載外部圖片並保存到 output 目錄，改由本地 /api/view 路徑提供"""
+    try:
+        import io
+        import random
+
+        # 串流下載並限制大小，避免把超大檔案或網頁整個讀入記憶體
+        with requests.get(url, timeout=URL_CHECK_TIMEOUT * 3, stream=True) as resp:
+            if resp.status_code != 200:
+                print(f"重新託管失敗，HTTP {resp.status_code}: {url}")
+                return None
+
+            content_length = resp.headers.get("Content-Length")
+            if content_length and content_length.isdigit() and int(content_length) > REHOST_MAX_DOWNLOAD_BYTES:
+                print(f"重新託管失敗，檔案過大: {int(content_length) / (1024 * 1024):.2f} MB")
+                return None
+
+            buffer = io.BytesIO()
+            for chunk in resp.iter_content(chunk_size=64 * 1024):
+                buffer.write(chunk)
+                if buffer.tell() > REHOST_MAX_DOWNLOAD_BYTES:
+                    print(f"重新託管失敗，檔案超過 {REHOST_MAX_DOWNLOAD_BYTES / (1024 * 1024):.0f} MB")
+                    return None
+
+        buffer.seek(0)
+        pil_image = Image.open(buffer)
+        if pil_image.mode not in ("RGB", "RGBA", "L"):
+            pil_image = pil_image.convert("RGBA" if "A" in pil_image.getbands() else "RGB")
+
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        random_id = random.randint(1000, 9999)
+        output_dir = get_output_directory()
+        filename = f"thread_image_{timestamp}_{random_id}.png"
+        filepath = os.path.join(output_dir, filename)
+        pil_image.save(filepath)
+
+        # PNG 超過大小限制時改存為 JPEG，必要時降低品質與縮小尺寸
+        if os.path.getsize(filepath) > IMAGE_MAX_BYTES:
+            os.remove(filepath)
+            filename = f"thread_image_{timestamp}_{random_id}.jpg"
+            filepath = os.path.join(output_dir, filename)
+            jpeg_image = pil_image.convert("RGB")
+            for quality in (90, 80, 70):
+                jpeg_image.save(filepath, quality=quality)
+                if os.path.getsize(filepath) <= IMAGE_MAX_BYTES:
+                    break
+            while os.path.getsize(filepath) > IMAGE_MAX_BYTES and min(jpeg_image.size) > 256:
+                jpeg_image = jpeg_image.resize((jpeg_image.width // 2, jpeg_image.height // 2))
+                jpeg_image.save(filepath, quality=80)
+
+            if os.path.getsize(filepath) > IMAGE_MAX_BYTES:
+                os.remove(filepath)
+                print(f"重新託管失敗，壓縮後仍超過 {IMAGE_MAX_BYTES / (1024 * 1024):.0f} MB")
+                return None
+
+        print(f"圖片已重新託管: {filepath}")
+        return f"{base_url}/api/view?filename={filename}"
+
+    except Exception as e:
+        print(f"重新託管圖片錯誤: {str(e)}")
+        return None
+
+def prevalidate_image_urls(urls, base_url, rehost=False):
+    """
+    並行檢查所有圖片網址，回傳 (可用網址列表, 錯誤訊息列表)，順序與輸入相同。
+    rehost 為 True 時，失敗或回應緩慢的來源會改由本地媒體路徑提供。
+    """
+    if not urls:
+        return [], []
+
+    with ThreadPoolExecutor(max_workers=min(len(urls), MAX_CONCURRENT_REQUESTS)) as executor:
+        checks = list(executor.map(check_image_url, urls))
+
+    final_urls = []
+    errors = []
+    for url, check in zip(urls, checks):
+        if rehost and (not check["ok"] or check["slow"]):
+            # 重新託管的檔案仍存在時沿用先前的本地網址
+            rehosted = check.get("rehosted_url")
+            if not (rehosted and rehosted.startswith(base_url) and os.path.exists(check.get("rehosted_path", ""))):
+                rehosted = rehost_image_url(url, base_url)
+                if rehosted:
+                    check["rehosted_url"] = rehosted
+                    check["rehosted_path"] = os.path.join(get_output_directory(), rehosted.split("filename=", 1)[1])
+            if rehosted:
+                final_urls.append(rehosted)
+                continue
+
+        if check["ok"]:
+            final_urls.append(url)
+        else:
+            errors.append(f"{url}: {check['error']}")
+
+    return final_urls, errors
+
+# Threads 單則貼文文字上限
+THREADS_TEXT_LIMIT = 500
+
+def split_graphemes(text):
+    """將文字切分為字素（使用者感知的字元），組合字元、變體選擇符、ZWJ 表情序列與國旗不會被拆開"""
+    import unicodedata
+
+    clusters = []
+    for char in text:
+        code = ord(char)
+        if clusters:
+            prev = clusters[-1]
+            prev_code = ord(prev[-1])
+            is_regional = 0x1F1E6 <= code <= 0x1F1FF
+            joins = (
+                unicodedata.combining(char)
+                or unicodedata.category(char) in ("Mn", "Mc", "Me")
+                or code == 0x200D
+                or prev_code == 0x200D
+                or 0xFE00 <= code <= 0xFE0F
+                or 0xE0100 <= code <= 0xE01EF
+                or 0x1F3FB <= code <= 0x1F3FF
+                or 0xE0020 <= code <= 0xE007F
+                or (prev == "\r" and char == "\n")
+                or (is_regional and len(prev) == 1 and 0x1F1E6 <= prev_code <= 0x1F1FF)
+            )
+            if joins:
+                clusters[-1] = prev + char
+                continue
+        clusters.append(char)
+    return clusters
+
+def split_text_into_parts(text, limit=THREADS_TEXT_LIMIT, add_part_numbers=True):
+    """
+    依字素數量將長文切分為多段，每段不超過 limit。
+    優先在段落、換行、句尾標點、空白處斷開；add_part_numbers 時每段結尾加上 (i/n)。
+    """
+    # 統一換行符號，讓 CRLF 文字也能在段落與換行處斷開
+    text = text.replace("\r\n", "\n").replace("\r", "\n")
+    graphemes = split_graphemes(text.strip())
+    if len(graphemes) <= limit:
+        return ["".join(graphemes)] if graphemes else []
+
+    sentence_ends = set("。！？!?.；;")
+    total_digits = 1
+    while True:
+        # 預留編號 " (i/n)" 的長度
+        reserve = 2 * total_digits + 4 if add_part_numbers else 0
+        size = limit - reserve
+        parts = []
+        start = 0
+        while start < len(graphemes):
+            end = min(start + size, len(graphemes))
+            if end < len(graphemes):
+                # 只在後半段尋找斷點，避免產生過短的段落
+                window_start = start + size // 2
+                best = None
+                for check in (
+                    lambda i: graphemes[i - 1] == "\n" and graphemes[i - 2] == "\n",
+                    lambda i: graphemes[i - 1] == "\n",
+                    lambda i: graphemes[i - 1] in sentence_ends,
+                    lambda i: graphemes[i - 1].isspace(),
+                ):
+                    for i in range(end, window_start, -1):
+                        if check(i):
+                            best = i
+                            break
+                    if best:
+                        break
+                if best:
+                    end = best
+            part = "".join(graphemes[start:end]).strip()
+            if part:
+                parts.append(part)
+            start = end
+
+        if not add_part_numbers:
+            return parts
+        if len(str(len(parts))) <= total_digits:
+            return [f"{part} ({i}/{len(parts)})" for i, part in enumerate(parts, 1)]
+        total_digits = len(str(len(parts)))
+
+# 發文結果快取，避免相同內容在時間窗口內重複發文
+PUBLISH_CACHE_FILE = os.path.join(TOKEN_DIR, "publish_cache.json")
+PUBLISH_CACHE_MAX_AGE = 7 * 24 * 60 * 60  # 快取紀錄最長保留秒數
+TENSOR_FINGERPRINT_SAMPLES = 4096
+
+_publish_cache_lock = threading.Lock()
+
+def fingerprint_tensor(tensor):
+    """計算圖片 tensor 的快速指紋：在原裝置上取等間距樣本與總和，只將少量數據搬到 CPU"""
+    with torch.no_grad():
+        flat = tensor.detach().reshape(-1)
+        if flat.numel() > TENSOR_FINGERPRINT_SAMPLES:
+            flat = flat[::flat.numel() // TENSOR_FINGERPRINT_SAMPLES][:TENSOR_FINGERPRINT_SAMPLES]
+        values = tensor.detach().float()
+        checksum = torch.stack([values.sum(), values.abs().sum(), (values * values).sum()])
+        sample = flat.float().cpu().numpy().tobytes() + checksum.cpu().numpy().tobytes()
+
+    digest = hashlib.sha1(f"{tuple(tensor.shape)}|{tensor.dtype}|".encode("utf-8"))
+    digest.update(sample)
+    return digest.hexdigest()
+
+def fingerprint_video_paths(video_paths):
+    """視頻網址直接使用字串；本地檔案加入大小與修改時間，檔案變更時指紋也會改變"""
+    parts = []
+    for path in video_paths.split('\n'):
+        path = path.strip()
+        if not path:
+            continue
+        if os.path.isfile(path):
+            stat = os.stat(path)
+            parts.append(f"{os.path.abspath(path)}|{stat.st_size}|{stat.st_mtime_ns}")
+        else:
+            parts.append(path)
+    return parts
+
+def fingerprint_inputs(**inputs):
+    """計算節點輸入的內容指紋，tensor 使用取樣指紋，視頻路徑包含檔案狀態"""
+    normalized = {}
+    for key, value in sorted(inputs.items()):
+        if isinstance(value, torch.Tensor):
+            normalized[key] = fingerprint_tensor(value)
+        elif "video" in key and isinstance(value, str):
+            normalized[key] = fingerprint_video_paths(value)
+        elif isinstance(value, (str, int, float, bool)) or value is None:
+            normalized[key] = value
+        else:
+            normalized[key] = repr(value)
+    return hashlib.sha1(json.dumps(normalized, ensure_ascii=False, sort_keys=True).encode("utf-8")).hexdigest()
+
+def get_configured_user_id():
+    """讀取目前配置的帳號 ID，讓不同帳號的相同內容擁有不同指紋；尚未配置時回傳 None"""
+    if not os.path.exists(CONFIG_FILE):
+        return None
+    try:
+        with open(CONFIG_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f).get("USER_ID")
+    except (OSError, ValueError):
+        return None
+
+def get_cached_publish_result(fingerprint, window_seconds):
+    """回傳時間窗口內相同內容的發文紀錄 {"result", "published_at", "post_ids", "complete"}，沒有則回傳 None"""
+    with _publish_cache_lock:
+        if not os.path.exists(PUBLISH_CACHE_FILE):
+            return None
+        try:
+            with open(PUBLISH_CACHE_FILE, 'r', encoding='utf-8') as f:
+                cache = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    entry = cache.get(fingerprint)
+    if entry and time.time() - entry["published_at"] < window_seconds:
+        return entry
+    return None
+
+def save_publish_result(fingerprint, result, post_ids=None, complete=True):
+    """記錄發文結果與已發布的貼文 ID，並清除過期的紀錄；complete 為 False 表示只發布了一部分"""
+    with _publish_cache_lock:
+        cache = {}
+        if os.path.exists(PUBLISH_CACHE_FILE):
+            try:
+                with open(PUBLISH_CACHE_FILE, 'r', encoding='utf-8') as f:
+                    cache = json.load(f)
+            except (OSError, ValueError):
+                cache = {}
+
+        now = time.time()
+        cache = {k: v for k, v in cache.items() if now - v.get("published_at", 0) < PUBLISH_CACHE_MAX_AGE}
+        cache[fingerprint] = {"result": result, "published_at": now, "post_ids": post_ids or [], "complete": complete}
+
+        with open(PUBLISH_CACHE_FILE, 'w', encoding='utf-8') as f:
+            json.dump(cache, f, ensure_ascii=False, indent=2)
+
+def publish_once(fingerprint, dedupe_window_minutes, publish):
+    """
+    時間窗口內已完整發布相同內容時直接回傳先前結果，否則執行 publish(record, previous)。
+    publish 在貼文發布成功後立即呼叫 record(訊息, post_ids, complete) 記錄結果，之後發生的錯誤不會造成重複發文。
+    previous 為時間窗口內未完整發布的紀錄（沒有則為 None），讓串文可以從上次發布到的段落接續。
+    dedupe_window_minutes 為 0 時停用。
+    """
+    previous = None
+    if dedupe_window_minutes > 0:
+        cached = get_cached_publish_result(fingerprint, dedupe_window_minutes * 60)
+        if cached and cached.get("complete", True):
+            print(f"{dedupe_window_minutes} 分鐘內已發布相同內容，略過重複發文")
+            return (f"{cached['result']}（相同內容已於 {dedupe_window_minutes} 分鐘內發布，未重複發文）",)
+        previous = cached
+
+    def record(message, post_ids=None, complete=True):
+        if dedupe_window_minutes > 0:
+            save_publish_result(fingerprint, message, post_ids, complete)
+
+    return publish(record, previous)
+
 class ThreadsAPI:
     def __init__(self, user_id, access_token, app_secret):
         self.user_id = user_id
@@ -74,6 +452,7 @@ class ThreadsAPI:
         image_url: str = None,
         video_url: str = None,
         is_carousel_item: bool = False,
+        reply_to_id: str = None,
     ) -> dict:
         params = {
             "access_token": self.access_token,
@@ -92,6 +471,9 @@ class ThreadsAPI:
         if is_carousel_item:
             params["is_carousel_item"] = "true"
 
+        if reply_to_id:
+            params["reply_to_id"] = reply_to_id
+
         print(f"創建媒體容器參數: {params}")
 
         resp = requests.post(
@@ -119,22 +501,287 @@ class ThreadsAPI:
 
         return resp.json()
 
-    def create_carousel_container(self, media_list: list, text: str = None) -> dict:
+    def create_carousel_container(self, media_list: list, text: str = None, reply_to_id: str = None) -> dict:
         media_id_list = ",".join(media_list)
+        params = {
+            "media_type": "CAROUSEL",
+            "children": media_id_list,
+            "access_token": self.access_token,
+            "text": text,
+        }
+        if reply_to_id:
+            params["reply_to_id"] = reply_to_id
+
         resp = requests.post(
             f"{self.api_url}/{self.user_id}/threads",
+            params=params,
+        )
+
+        if resp.status_code != 200:
+            raise Exception(resp.json())
+
+        return resp.json()
+
+    def get_containers_status(self, media_ids: list) -> dict:
+        """一次查詢多個媒體容器狀態，回傳 {media_id: {"status": ..., "error_message": ...}}"""
+        if not media_ids:
+            return {}
+
+        # 優先使用多 ID 查詢，一次請求取得所有容器狀態
+        if getattr(self, "_multi_id_supported", True):
+            try:
+                resp = requests.get(
+                    f"{self.api_url}/",
+                    params={
+                        "ids": ",".join(media_ids),
+                        "fields": "status,error_message",
+                        "access_token": self.access_token,
+                    },
+                )
+                if resp.status_code == 200:
+                    return resp.json()
+                print(f"多 ID 狀態查詢不支援，改為逐一查詢: {resp.status_code} - {resp.text}")
+                self._multi_id_supported = False
+            except Exception as e:
+                print(f"多 ID 狀態查詢錯誤，改為逐一查詢: {str(e)}")
+
+        # 備用方案：並行逐一查詢每個容器
+        def fetch(media_id):
+            try:
+                resp = requests.get(
+                    f"{self.api_url}/{media_id}",
+                    params={
+                        "fields": "status,error_message",
+                        "access_token": self.access_token,
+                    },
+                )
+                if resp.status_code == 200:
+                    return media_id, resp.json()
+                print(f"狀態檢查 API 錯誤 ({media_id}): {resp.status_code} - {resp.text}")
+            except Exception as e:
+                print(f"檢查媒體狀態時發生錯誤 ({media_id}): {str(e)}")
+            return media_id, None
+
+        statuses = {}
+        with ThreadPoolExecutor(max_workers=min(len(media_ids), MAX_CONCURRENT_REQUESTS)) as executor:
+            for media_id, status in executor.map(fetch, media_ids):
+                if status is not None:
+                    statuses[media_id] = status
+        return statuses
+
+    def wait_for_containers(
+        self,
+        media_ids: list,
+        on_finished=None,
+        check_interval: int = 20,
+        max_attempts: int = 30,
+    ) -> dict:
+        """
+        以單一輪詢迴圈追蹤多個媒體容器，每次檢查所有未完成的容器。
+        容器一旦 FINISHED 即呼叫 on_finished(media_id)，不必等待其他容器。
+        回傳 {media_id: (status, error_message)}，未完成者狀態為 "TIMEOUT"。
+        """
+        results = {}
+        pending = list(media_ids)
+
+        for attempt in range(max_attempts):
+            print(f"第 {attempt + 1} 次檢查媒體容器狀態，待處理: {len(pending)} 個")
+            statuses = self.get_containers_status(pending)
+
+            for media_id in list(pending):
+                status_response = statuses.get(media_id)
+                if not status_response:
+                    continue
+
+                status = status_response.get("status")
+                if status == "FINISHED":
+                    print(f"媒體容器 {media_id} 處理完成")
+                    pending.remove(media_id)
+                    results[media_id] = (status, None)
+                    if on_finished is not None:
+                        on_finished(media_id)
+                elif status in ("ERROR", "EXPIRED"):
+                    error_message = status_response.get("error_message", "未知錯誤")
+                    print(f"媒體容器 {media_id} 處理失敗: {error_message}")
+                    pending.remove(media_id)
+                    results[media_id] = (status, error_message)
+
+            if not pending:
+                break
+
+            if attempt < max_attempts - 1:
+                print(f"仍有 {len(pending)} 個媒體容器處理中，{check_interval} 秒後重新檢查...")
+                time.sleep(check_interval)
+
+        for media_id in pending:
+            results[media_id] = ("TIMEOUT", "媒體容器處理超時")
+
+        return results
+
+    def create_mixed_carousel_container(self, media_items: list, text: str = None) -> dict:
+        """
+        創建圖片/視頻混合輪播容器。media_items 為 [(media_type, url), ...]，
+        media_type 為 "IMAGE" 或 "VIDEO"。
+        所有子項目並行創建，並行等待全部 FINISHED 後才創建 CAROUSEL 容器。
+        """
+        if len(media_items) < CAROUSEL_MIN_ITEMS or len(media_items) > CAROUSEL_MAX_ITEMS:
+            raise Exception(
+                f"輪播項目數量必須介於 {CAROUSEL_MIN_ITEMS} 到 {CAROUSEL_MAX_ITEMS} 之間，目前為 {len(media_items)}"
+            )
+
+        def create(item):
+            media_type, url = item
+            if media_type == "VIDEO":
+                media = self.create_media_container(media_type="VIDEO", video_url=url, is_carousel_item=True)
+            else:
+                media = self.create_media_container(media_type="IMAGE", image_url=url, is_carousel_item=True)
+            print(f"輪播項目 ID: {media['id']} ({media_type})")
+            return media["id"]
+
+        # 步驟 1: 並行創建所有子項目，結果保持原始順序
+        print(f"並行創建 {len(media_items)} 個輪播項目...")
+        with ThreadPoolExecutor(max_workers=min(len(media_items), MAX_CONCURRENT_REQUESTS)) as executor:
+            media_ids = list(executor.map(create, media_items))
+
+        # 步驟 2: 以共用輪詢等待所有子項目完成
+        statuses = self.wait_for_containers(media_ids)
+        failed = [
+            f"{media_id}: {status} - {error_message}"
+            for media_id, (status, error_message) in statuses.items()
+            if status != "FINISHED"
+        ]
+        if failed:
+            raise Exception(f"輪播項目處理失敗: {'; '.join(failed)}")
+
+        # 步驟 3: 所有子項目完成後才創建輪播容器
+        print(f"創建輪播容器，包含 {len(media_ids)} 個項目")
+        return self.create_carousel_container(media_ids, text)
+
+    def publish_media_items(self, text: str, media_items: list) -> dict:
+        """依媒體數量與類型發布純文字、單圖、單一視頻或混合輪播貼文"""
+        if not media_items:
+            media = self.create_media_container(text=text)
+        elif len(media_items) == 1:
+            media_type, url = media_items[0]
+            if media_type == "VIDEO":
+                media = self.create_media_container(text=text, media_type="VIDEO", video_url=url)
+                status, error_message = self.wait_for_containers([media["id"]])[media["id"]]
+                if status != "FINISHED":
+                    raise Exception(f"媒體容器處理失敗 - {error_message}")
+            else:
+                media = self.create_media_container(text=text, media_type="IMAGE", image_url=url)
+        else:
+            media = self.create_mixed_carousel_container(media_items, text)
+
+        return self.publish_container(media["id"])
+
+    def publish_reply_chain(self, parts: list, on_published=None, published_ids=None) -> list:
+        """
+        將多段內容發布為串文，parts 為 [(text, media_items), ...]。
+        每段發布後呼叫 on_published(已發布的貼文 ID 列表)。
+        published_ids 為先前已發布的前幾段貼文 ID，提供時略過這些段落，從最後一則貼文接續回覆。
+        回覆容器必須在上一段發布後才能指定 reply_to_id，因此先並行創建第一段容器與所有輪播子項目，
+        並行等待其處理完成，之後才依序創建各段回覆容器並發布。回傳各段貼文 ID。
+        """
+        root_text, root_media = parts[0]
+        post_ids = list(published_ids or [])
+        start = len(post_ids)
+
+        # 步驟 1: 並行創建所有不依賴上一段貼文的容器
+        tasks = []
+        for index, (_, media_items) in enumerate(parts[start:], start):
+            if len(media_items) > 1:
+                tasks.extend(("child", index, item) for item in media_items)
+        if start == 0 and len(root_media) <= 1:
+            tasks.append(("root", 0, root_media[0] if root_media else None))
+
+        def create(task):
+            kind, index, item = task
+            if kind == "child":
+                media_type, url = item
+                if media_type == "VIDEO":
+                    media = self.create_media_container(media_type="VIDEO", video_url=url, is_carousel_item=True)
+                else:
+                    media = self.create_media_container(media_type="IMAGE", image_url=url, is_carousel_item=True)
+            elif item is None:
+                media = self.create_media_container(text=root_text)
+            elif item[0] == "VIDEO":
+                media = self.create_media_container(text=root_text, media_type="VIDEO", video_url=item[1])
+            else:
+                media = self.create_media_container(text=root_text, media_type="IMAGE", image_url=item[1])
+            return kind, index, media["id"]
+
+        child_ids = {index: [] for index in range(len(parts))}
+        root_id = None
+        if tasks:
+            print(f"並行預先創建 {len(tasks)} 個容器...")
+            with ThreadPoolExecutor(max_workers=min(len(tasks), MAX_CONCURRENT_REQUESTS)) as executor:
+                for kind, index, media_id in executor.map(create, tasks):
+                    if kind == "child":
+                        child_ids[index].append(media_id)
+                    else:
+                        root_id = media_id
+
+            # 步驟 2: 以共用輪詢並行等待所有預先創建的容器
+            pending_ids = [media_id for ids in child_ids.values() for media_id in ids]
+            if root_id:
+                pending_ids.append(root_id)
+            statuses = self.wait_for_containers(pending_ids)
+            failed = [
+                f"{media_id}: {status} - {error_message}"
+                for media_id, (status, error_message) in statuses.items()
+                if status != "FINISHED"
+            ]
+            if failed:
+                raise Exception(f"容器處理失敗: {'; '.join(failed)}")
+
+        # 步驟 3: 依序創建回覆容器並發布，每段回覆上一段貼文
+        for index, (part_text, media_items) in enumerate(parts[start:], start):
+            try:
+                reply_to_id = post_ids[-1] if post_ids else None
+                if index == 0 and root_id:
+                    media_id = root_id
+                elif len(media_items) > 1:
+                    media_id = self.create_carousel_container(child_ids[index], part_text, reply_to_id)["id"]
+                elif media_items and media_items[0][0] == "VIDEO":
+                    media_id = self.create_media_container(
+                        text=part_text, media_type="VIDEO", video_url=media_items[0][1], reply_to_id=reply_to_id
+                    )["id"]
+                    status, error_message = self.wait_for_containers([media_id])[media_id]
+                    if status != "FINISHED":
+                        raise Exception(f"媒體容器處理失敗 - {error_message}")
+                elif media_items:
+                    media_id = self.create_media_container(
+                        text=part_text, media_type="IMAGE", image_url=media_items[0][1], reply_to_id=reply_to_id
+                    )["id"]
+                else:
+                    media_id = self.create_media_container(text=part_text, reply_to_id=reply_to_id)["id"]
+
+                result = self.publish_container(media_id)
+                post_ids.append(result["id"])
+                print(f"第 {index + 1}/{len(parts)} 段已發布，ID: {result['id']}")
+                if on_published is not None:
+                    on_published(list(post_ids))
+            except Exception as e:
+                raise Exception(f"第 {index + 1} 段發布失敗（已發布 {len(post_ids)} 段）: {str(e)}")
+
+        return post_ids
+
+    def get_publishing_limit(self) -> dict:
+        """查詢帳號 24 小時內的發文配額使用量"""
+        resp = requests.get(
+            f"{self.api_url}/{self.user_id}/threads_publishing_limit",
             params={
-                "media_type": "CAROUSEL",
-                "children": media_id_list,
+                "fields": "quota_usage,config",
                 "access_token": self.access_token,
-                "text": text,
             },
         )
 
         if resp.status_code != 200:
             raise Exception(resp.json())
 
-        return resp.json()
+        data = resp.json().get("data", [])
+        return data[0] if data else {}
 
     def get_user_bio(self):
         resp = requests.get(
@@ -147,6 +794,304 @@ class ThreadsAPI:
         return resp.json()
 
 
+# 排程發文設定
+SCHEDULE_DB_FILE = os.path.join(TOKEN_DIR, "schedule.db")
+SCHEDULE_MIN_INTERVAL = 300  # 同一帳號兩則發文的預設最小間隔秒數
+DAILY_PUBLISH_QUOTA = 250  # Threads 每 24 小時發文上限
+SCHEDULER_IDLE_INTERVAL = 60  # 排程器閒置時的最長等待秒數
+QUOTA_WINDOW = 24 * 60 * 60
+QUOTA_RETRY_DELAY = 60 * 60  # API 回報配額已滿但本地紀錄無法推算時的延後秒數
+
+class ThreadsScheduler:
+    """
+    持久化排程發文引擎。排程存放於 TOKEN_DIR 下的 SQLite，
+    由單一背景執行緒依到期時間發布，並依帳號配額與最小間隔分散發文。
+    """
+
+    def __init__(self, db_path=SCHEDULE_DB_FILE):
+        self.db_path = db_path
+        self._wake_event = threading.Event()
+        self._worker = None
+        self._lock = threading.Lock()
+        self._init_db()
+
+    def _connect(self):
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def _init_db(self):
+        with self._connect() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS scheduled_posts (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    user_id TEXT NOT NULL,
+                    status TEXT NOT NULL DEFAULT 'pending',
+                    due_at REAL NOT NULL,
+                    min_interval REAL NOT NULL,
+                    plan TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    published_at REAL,
+                    result TEXT
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_scheduled_posts_status_due ON scheduled_posts (status, due_at)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_scheduled_posts_user_due ON scheduled_posts (user_id, due_at)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_scheduled_posts_user_published ON scheduled_posts (user_id, published_at)")
+
+            # 上次關閉時正在發布的項目無法確定是否已送出，標記為失敗避免重複發文
+            conn.execute(
+                "UPDATE scheduled_posts SET status = 'failed', result = ? WHERE status = 'publishing'",
+                ("發布過程中斷，請確認後重新排程",),
+            )
+
+    def next_free_slot(self, user_id, min_interval=SCHEDULE_MIN_INTERVAL, after=None):
+        """
+        找出現在之後最早的空檔：與前後排程至少相隔 min_interval，
+        且包含該時間的任一 24 小時窗口加入此貼文後不超過配額。
+        """
+        from bisect import bisect_left
+
+        candidate = max(after or 0, time.time())
+
+        with self._connect() as conn:
+            while True:
+                # 與鄰近排程間隔不足時，移到衝突排程之後再重新檢查
+                conflict = conn.execute(
+                    "SELECT MAX(due_at) FROM scheduled_posts WHERE user_id = ? AND status != 'failed' "
+                    "AND due_at > ? AND due_at < ?",
+                    (user_id, candidate - min_interval, candidate + min_interval),
+                ).fetchone()[0]
+                if conflict is not None:
+                    candidate = conflict + min_interval
+                    continue
+
+                # 檢查所有包含此時間的 24 小時窗口，超過配額時移到該窗口之後
+                times = [
+                    row[0] for row in conn.execute(
+                        "SELECT due_at FROM scheduled_posts WHERE user_id = ? AND status != 'failed' "
+                        "AND due_at > ? AND due_at < ? ORDER BY due_at",
+                        (user_id, candidate - QUOTA_WINDOW, candidate + QUOTA_WINDOW),
+                    )
+                ]
+                times.insert(bisect_left(times, candidate), candidate)
+
+                overflow_start = None
+                for index, start in enumerate(times):
+                    if start > candidate:
+                        break
+                    if bisect_left(times, start + QUOTA_WINDOW) - index > DAILY_PUBLISH_QUOTA:
+                        overflow_start = start
+                        break
+
+                if overflow_start is None:
+                    return candidate
+                candidate = overflow_start + QUOTA_WINDOW
+
+    def submit(self, user_id, text, media_items, due_at=None, min_interval=SCHEDULE_MIN_INTERVAL):
+        """加入排程，due_at 為 None 時自動使用下一個可用時段，回傳 (排程 ID, 發文時間)"""
+        with self._lock:
+            if due_at is None:
+                due_at = self.next_free_slot(user_id, min_interval)
+
+            plan = {"text": text, "media_items": [list(item) for item in media_items]}
+            with self._connect() as conn:
+                cursor = conn.execute(
+                    "INSERT INTO scheduled_posts (user_id, due_at, min_interval, plan, created_at) VALUES (?, ?, ?, ?, ?)",
+                    (user_id, due_at, min_interval, json.dumps(plan, ensure_ascii=False), time.time()),
+                )
+                schedule_id = cursor.lastrowid
+
+        self.start()
+        self._wake_event.set()
+        return schedule_id, due_at
+
+    def start(self):
+        """啟動背景發文執行緒（已啟動時不重複建立）"""
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name="ThreadsScheduler", daemon=True)
+                self._worker.start()
+                print("Threads 排程器已啟動")
+
+    def _run(self):
+        while True:
+            # 先清除喚醒事件再讀取排程，避免讀取期間加入的項目被遺漏
+            self._wake_event.clear()
+            try:
+                wait_seconds = self._process_next()
+            except Exception as e:
+                print(f"排程器錯誤: {str(e)}")
+                import traceback
+                traceback.print_exc()
+                wait_seconds = SCHEDULER_IDLE_INTERVAL
+
+            if wait_seconds > 0:
+                self._wake_event.wait(min(wait_seconds, SCHEDULER_IDLE_INTERVAL))
+
+    def _ready_at(self, conn, user_id, min_interval, now):
+        """依最小間隔與 24 小時配額計算帳號最早可發文的時間"""
+        ready_at = now
+
+        # 檢查與上一則發文的間隔
+        last_published = conn.execute(
+            "SELECT MAX(published_at) FROM scheduled_posts WHERE user_id = ?",
+            (user_id,),
+        ).fetchone()[0]
+        if last_published is not None:
+            ready_at = max(ready_at, last_published + min_interval)
+
+        # 檢查本地紀錄的 24 小時發文數量
+        recent = conn.execute(
+            "SELECT published_at FROM scheduled_posts WHERE user_id = ? AND published_at > ? "
+            "ORDER BY published_at LIMIT 1 OFFSET ?",
+            (user_id, now - QUOTA_WINDOW, DAILY_PUBLISH_QUOTA - 1),
+        ).fetchone()
+        if recent is not None:
+            oldest = conn.execute(
+                "SELECT MIN(published_at) FROM scheduled_posts WHERE user_id = ? AND published_at > ?",
+                (user_id, now - QUOTA_WINDOW),
+            ).fetchone()[0]
+            ready_at = max(ready_at, oldest + QUOTA_WINDOW)
+
+        return ready_at
+
+    def _process_next(self):
+        """處理下一個可發布的到期項目，回傳距離下次需要檢查的秒數"""
+        with self._connect() as conn:
+            now = time.time()
+            wait_until = None
+
+            next_due = conn.execute(
+                "SELECT MIN(due_at) FROM scheduled_posts WHERE status = 'pending' AND due_at > ?",
+                (now,),
+            ).fetchone()[0]
+            if next_due is not None:
+                wait_until = next_due
+
+            # 各帳號依到期順序處理，某帳號受間隔或配額限制時不影響其他帳號
+            row = None
+            due_users = conn.execute(
+                "SELECT user_id, MIN(due_at) FROM scheduled_posts WHERE status = 'pending' AND due_at <= ? "
+                "GROUP BY user_id ORDER BY MIN(due_at)",
+                (now,),
+            ).fetchall()
+            for user_id, _ in due_users:
+                head = conn.execute(
+                    "SELECT id, user_id, min_interval, plan FROM scheduled_posts "
+                    "WHERE user_id = ? AND status = 'pending' ORDER BY due_at LIMIT 1",
+                    (user_id,),
+                ).fetchone()
+                ready_at = self._ready_at(conn, user_id, head[2], now)
+                if ready_at <= now:
+                    row = head
+                    break
+                wait_until = ready_at if wait_until is None else min(wait_until, ready_at)
+
+            if row is None:
+                return SCHEDULER_IDLE_INTERVAL if wait_until is None else wait_until - now
+
+            schedule_id, user_id, min_interval, plan = row
+            conn.execute("UPDATE scheduled_posts SET status = 'publishing' WHERE id = ?", (schedule_id,))
+
+        status, result = self._publish(schedule_id, user_id, json.loads(plan))
+
+        with self._connect() as conn:
+            if status == "pending":
+                # API 回報配額已滿：將此項目延後到預估可發文的時間，不重複佔用佇列前端
+                now = time.time()
+                retry_at = max(self._ready_at(conn, user_id, min_interval, now), now + QUOTA_RETRY_DELAY)
+                conn.execute(
+                    "UPDATE scheduled_posts SET status = 'pending', due_at = ? WHERE id = ?",
+                    (retry_at, schedule_id),
+                )
+                print(f"排程 #{schedule_id} 延後至 {datetime.fromtimestamp(retry_at).strftime('%Y-%m-%d %H:%M:%S')}")
+                return 0
+            if status == "failed":
+                conn.execute(
+                    "UPDATE scheduled_posts SET status = 'failed', result = ? WHERE id = ?",
+                    (result, schedule_id),
+                )
+            else:
+                # published_at 已在貼文發布當下記錄，這裡只更新結果訊息
+                conn.execute("UPDATE scheduled_posts SET result = ? WHERE id = ?", (result, schedule_id))
+        print(f"排程 #{schedule_id} {status}: {result}")
+        return 0
+
+    def _mark_published(self, schedule_id, post_id):
+        """貼文一發布就記錄發布時間，確保後續錯誤不影響配額與間隔計算"""
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE scheduled_posts SET status = 'published', published_at = ?, result = ? WHERE id = ?",
+                (time.time(), f"貼文 ID: {post_id}", schedule_id),
+            )
+
+    def _publish(self, schedule_id, user_id, plan):
+        """
+        發布單一排程項目，回傳 (狀態, 結果訊息)。
+        只有在貼文發布前發生的錯誤才回傳 "failed"；發布後的錯誤（例如取得用戶名稱失敗）仍視為已發布。
+        """
+        try:
+            if not os.path.exists(CONFIG_FILE):
+                return "failed", "錯誤: 請先執行 StartWithLongLiveToken 節點"
+
+            with open(CONFIG_FILE, 'r', encoding='utf-8') as f:
+                config = json.load(f)
+
+            if config["USER_ID"] != user_id:
+                return "failed", f"錯誤: 目前配置的帳號與排程帳號 {user_id} 不符"
+
+            threads_api = ThreadsAPI(
+                config["USER_ID"],
+                config["ACCESS_TOKEN"],
+                config["APP_SECRET"]
+            )
+
+            # 以 API 回報的配額為準，避免與排程外的發文衝突
+            try:
+                limit = threads_api.get_publishing_limit()
+                quota_total = limit.get("config", {}).get("quota_total", DAILY_PUBLISH_QUOTA)
+                if limit.get("quota_usage", 0) >= quota_total:
+                    print(f"帳號發文配額已滿 ({limit.get('quota_usage')}/{quota_total})，延後發布")
+                    return "pending", None
+            except Exception as e:
+                print(f"無法取得發文配額，依本地紀錄繼續: {str(e)}")
+
+            media_items = [tuple(item) for item in plan["media_items"]]
+            result = threads_api.publish_media_items(plan["text"], media_items)
+        except Exception as e:
+            return "failed", f"錯誤: {str(e)}"
+
+        post_id = result["id"]
+        self._mark_published(schedule_id, post_id)
+
+        try:
+            username = threads_api.get_user_bio().get("username", "")
+            return "published", f"https://www.threads.net/@{username}/post/{post_id}"
+        except Exception as e:
+            print(f"無法取得用戶名稱: {str(e)}")
+            return "published", f"貼文 ID: {post_id}"
+
+    def pending_count(self, user_id):
+        with self._connect() as conn:
+            return conn.execute(
+                "SELECT COUNT(*) FROM scheduled_posts WHERE user_id = ? AND status = 'pending'",
+                (user_id,),
+            ).fetchone()[0]
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+def get_scheduler():
+    """取得全域排程器實例"""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = ThreadsScheduler()
+        return _scheduler
+
+
 class StartWithLongLiveToken:
     @classmethod
     def INPUT_TYPES(cls):
@@ -194,12 +1139,18 @@ class StartWithLongLiveToken:
             return (f"錯誤: {str(e)}",)
 
 
+# ThreadsHistory 各回溯天數上次取得歷史的時間
+_history_fetched_at = {}
+
 class ThreadsHistory:
     @classmethod
     def INPUT_TYPES(cls):
         return {
             "required": {
                 "backfill_days": ("INT", {"default": 7, "min": 1, "max": 365, "step": 1}),
+            },
+            "optional": {
+                "cache_ttl_minutes": ("INT", {"default": 10, "min": 0, "max": 1440, "step": 1}),
             }
         }
 
@@ -208,7 +1159,27 @@ class ThreadsHistory:
     FUNCTION = "get_history"
     CATEGORY = "ComfyUI-Thread"
 
-    def get_history(self, backfill_days):
+    @classmethod
+    def IS_CHANGED(cls, backfill_days, cache_ttl_minutes=10):
+        # 快取時間內回傳相同的取得時間，讓 ComfyUI 沿用上次結果；過期或 TTL 為 0 時重新取得
+        if cache_ttl_minutes <= 0:
+            return float("nan")
+
+        now = time.time()
+        fetched_at = _history_fetched_at.get(backfill_days)
+        if fetched_at is None or now - fetched_at >= cache_ttl_minutes * 60:
+            _history_fetched_at[backfill_days] = now
+            return now
+        return fetched_at
+
+    def get_history(self, backfill_days, cache_ttl_minutes=10):
+        result = self._get_history(backfill_days)
+        if result[0].startswith("錯誤") or result[0].startswith("API 錯誤"):
+            # 失敗的結果不快取，下次執行時重新取得
+            _history_fetched_at.pop(backfill_days, None)
+        return result
+
+    def _get_history(self, backfill_days):
         try:
             # 讀取配置
             if not os.path.exists(CONFIG_FILE):
@@ -299,6 +1270,8 @@ class PublishThread:
                 "ComfyUIHttpsURL": ("STRING", {"multiline": False, "default": ""}),
                 "image": ("IMAGE",),
                 "image_url": ("STRING", {"multiline": True, "default": ""}),
+                "url_check": (["validate", "validate_and_rehost", "off"], {"default": "validate"}),
+                "dedupe_window_minutes": ("INT", {"default": 10, "min": 0, "max": 10080, "step": 1}),
             }
         }
 
@@ -307,7 +1280,21 @@ class PublishThread:
     FUNCTION = "publish_thread"
     CATEGORY = "ComfyUI-Thread"
 
-    def publish_thread(self, text, ComfyUIHttpsURL="", image=None, image_url=""):
+    @classmethod
+    def IS_CHANGED(cls, **kwargs):
+        return fingerprint_inputs(**kwargs)
+
+    def publish_thread(self, text, ComfyUIHttpsURL="", image=None, image_url="", url_check="validate", dedupe_window_minutes=10):
+        fingerprint = fingerprint_inputs(
+            node="PublishThread", user_id=get_configured_user_id(), text=text, image=image, image_url=image_url
+        )
+        return publish_once(
+            fingerprint,
+            dedupe_window_minutes,
+            lambda record, _previous: self._publish_thread(text, ComfyUIHttpsURL, image, image_url, url_check, record),
+        )
+
+    def _publish_thread(self, text, ComfyUIHttpsURL="", image=None, image_url="", url_check="validate", record=None):
         try:
             # 讀取配置
             if not os.path.exists(CONFIG_FILE):
@@ -353,12 +1340,22 @@ class PublishThread:
                 print(f"原始圖片網址輸入: {repr(image_url)}")
                 urls = [u.strip() for u in image_url.split('\n') if u.strip()]
                 print(f"解析後的網址列表: {urls}")
+                valid_urls = []
                 for url in urls:
                     if url.startswith('http://') or url.startswith('https://'):
-                        image_urls.append(url)
+                        valid_urls.append(url)
                         print(f"添加有效網址: {url}")
                     else:
                         print(f"跳過無效網址: {url}")
+
+                # 在創建任何容器前並行檢查所有外部網址
+                if url_check != "off":
+                    valid_urls, url_errors = prevalidate_image_urls(
+                        valid_urls, base_url, rehost=(url_check == "validate_and_rehost")
+                    )
+                    if url_errors:
+                        return ("錯誤: 圖片網址檢查失敗\n" + "\n".join(url_errors),)
+                image_urls.extend(valid_urls)
             
             print(f"收集到的圖片網址總數: {len(image_urls)}")
             print(f"圖片網址列表: {image_urls}")
@@ -394,14 +1391,21 @@ class PublishThread:
                 print(f"輪播容器 ID: {carousel['id']}")
                 result = threads_api.publish_container(carousel["id"])
             
+            # 貼文已發布，先記錄結果，後續錯誤不會導致重複發文
+            thread_id = result["id"]
+            if record:
+                record(f"發送成功！貼文 ID: {thread_id}", [thread_id])
+            
             # 取得用戶名稱來組合網址
             user_info = threads_api.get_user_bio()
             username = user_info.get("username", "")
-            thread_id = result["id"]
             
             post_url = f"https://www.threads.net/@{username}/post/{thread_id}"
             
-            return (f"發送成功！貼文網址: {post_url}",)
+            message = f"發送成功！貼文網址: {post_url}"
+            if record:
+                record(message)
+            return (message,)
             
         except Exception as e:
             return (f"錯誤: {str(e)}",)
@@ -556,6 +1560,7 @@ class ThreadPublishVideo:
             },
             "optional": {
                 "ComfyUIHttpsURL": ("STRING", {"multiline": False, "default": ""}),
+                "dedupe_window_minutes": ("INT", {"default": 10, "min": 0, "max": 10080, "step": 1}),
             }
         }
 
@@ -564,7 +1569,21 @@ class ThreadPublishVideo:
     FUNCTION = "publish_video"
     CATEGORY = "ComfyUI-Thread"
 
-    def publish_video(self, text, video_path, ComfyUIHttpsURL=""):
+    @classmethod
+    def IS_CHANGED(cls, **kwargs):
+        return fingerprint_inputs(**kwargs)
+
+    def publish_video(self, text, video_path, ComfyUIHttpsURL="", dedupe_window_minutes=10):
+        fingerprint = fingerprint_inputs(
+            node="ThreadPublishVideo", user_id=get_configured_user_id(), text=text, video_path=video_path
+        )
+        return publish_once(
+            fingerprint,
+            dedupe_window_minutes,
+            lambda record, _previous: self._publish_video(text, video_path, ComfyUIHttpsURL, record),
+        )
+
+    def _publish_video(self, text, video_path, ComfyUIHttpsURL="", record=None):
         try:
             # 讀取配置
             if not os.path.exists(CONFIG_FILE):
@@ -629,54 +1648,32 @@ class ThreadPublishVideo:
             
             # 步驟 2: 檢查媒體容器狀態
             print("開始檢查媒體容器處理狀態...")
-            max_attempts = 30  # 最多檢查 30 次 (10 分鐘)
-            check_interval = 20  # 每 20 秒檢查一次
-            
-            for attempt in range(max_attempts):
-                print(f"第 {attempt + 1} 次檢查媒體容器狀態...")
-                
-                # 獲取媒體容器狀態
-                status_response = self._check_media_status(threads_api, media_id, config["ACCESS_TOKEN"])
-                
-                if status_response:
-                    status = status_response.get("status")
-                    print(f"媒體容器狀態: {status}")
-                    
-                    if status == "FINISHED":
-                        print("媒體容器處理完成，準備發布...")
-                        break
-                    elif status == "ERROR":
-                        error_message = status_response.get("error_message", "未知錯誤")
-                        return (f"錯誤: 媒體容器處理失敗 - {error_message}",)
-                    elif status in ["IN_PROGRESS", "PUBLISHED"]:
-                        if attempt < max_attempts - 1:
-                            print(f"媒體容器仍在處理中，{check_interval} 秒後重新檢查...")
-                            time.sleep(check_interval)
-                        else:
-                            return ("錯誤: 媒體容器處理超時，請稍後再試",)
-                    else:
-                        print(f"未知狀態: {status}，繼續等待...")
-                        if attempt < max_attempts - 1:
-                            time.sleep(check_interval)
-                else:
-                    print("無法獲取媒體容器狀態，繼續等待...")
-                    if attempt < max_attempts - 1:
-                        time.sleep(check_interval)
-            else:
+            status, error_message = threads_api.wait_for_containers([media_id])[media_id]
+            if status == "TIMEOUT":
                 return ("錯誤: 媒體容器處理超時，請檢查視頻是否符合 Threads 規格要求",)
+            elif status != "FINISHED":
+                return (f"錯誤: 媒體容器處理失敗 - {error_message}",)
+            print("媒體容器處理完成，準備發布...")
             
             # 步驟 3: 發布視頻
             print("正在發布視頻...")
             result = threads_api.publish_container(media_id)
             
+            # 貼文已發布，先記錄結果，後續錯誤不會導致重複發文
+            thread_id = result["id"]
+            if record:
+                record(f"視頻發送成功！貼文 ID: {thread_id}", [thread_id])
+            
             # 取得用戶名稱來組合網址
             user_info = threads_api.get_user_bio()
             username = user_info.get("username", "")
-            thread_id = result["id"]
             
             post_url = f"https://www.threads.net/@{username}/post/{thread_id}"
             
-            return (f"視頻發送成功！貼文網址: {post_url}",)
+            message = f"視頻發送成功！貼文網址: {post_url}"
+            if record:
+                record(message)
+            return (message,)
             
         except Exception as e:
             print(f"視頻發布錯誤: {str(e)}")
@@ -750,27 +1747,540 @@ class ThreadPublishVideo:
             traceback.print_exc()
             return None
 
-    def _check_media_status(self, threads_api, media_id, access_token):
-        """檢查媒體容器狀態"""
+
+class ThreadPublishVideoBatch(ThreadPublishVideo):
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {
+            "required": {
+                "text": ("STRING", {"multiline": True, "default": ""}),
+                "video_paths": ("STRING", {"multiline": True, "default": ""}),
+            },
+            "optional": {
+                "captions": ("STRING", {"multiline": True, "default": ""}),
+                "ComfyUIHttpsURL": ("STRING", {"multiline": False, "default": ""}),
+                "dedupe_window_minutes": ("INT", {"default": 10, "min": 0, "max": 10080, "step": 1}),
+            }
+        }
+
+    RETURN_TYPES = ("STRING",)
+    RETURN_NAMES = ("result",)
+    FUNCTION = "publish_videos"
+    CATEGORY = "ComfyUI-Thread"
+
+    def publish_videos(self, text, video_paths, captions="", ComfyUIHttpsURL="", dedupe_window_minutes=10):
         try:
-            # 使用 Threads API 檢查媒體容器狀態
-            resp = requests.get(
-                f"{threads_api.api_url}/{media_id}",
-                params={
-                    "fields": "status,error_message",
-                    "access_token": access_token,
-                },
+            # 讀取配置
+            if not os.path.exists(CONFIG_FILE):
+                return ("錯誤: 請先執行 StartWithLongLiveToken 節點",)
+
+            with open(CONFIG_FILE, 'r', encoding='utf-8') as f:
+                config = json.load(f)
+
+            threads_api = ThreadsAPI(
+                config["USER_ID"],
+                config["ACCESS_TOKEN"],
+                config["APP_SECRET"]
             )
-            
-            if resp.status_code == 200:
-                return resp.json()
+
+            # 處理 ComfyUI URL 配置
+            base_url = load_base_url()
+            if ComfyUIHttpsURL.strip():
+                # 更新 base URL
+                base_url = ComfyUIHttpsURL.strip()
+                save_base_url(base_url)
+                print(f"更新基礎網址為: {base_url}")
+
+            print(f"使用基礎網址: {base_url}")
+
+            # 每行一個視頻路徑或網址
+            paths = [p.strip() for p in video_paths.split('\n') if p.strip()]
+            if not paths:
+                return ("錯誤: 請提供視頻路徑或網址",)
+
+            # 個別文字以 "---" 分隔，未提供時使用共用文字
+            caption_list = self._split_captions(captions)
+
+            lines = [""] * len(paths)
+            succeeded = set()
+            fingerprints = {}
+            jobs = []
+            for i, path in enumerate(paths):
+                caption = caption_list[i] if i < len(caption_list) and caption_list[i] else text
+
+                # 每部視頻個別判斷是否已在時間窗口內發布，部分成功後重新執行不會重複發文
+                fingerprints[i] = fingerprint_inputs(
+                    node="ThreadPublishVideoBatch", user_id=config["USER_ID"], text=caption, video_path=path
+                )
+                if dedupe_window_minutes > 0:
+                    cached = get_cached_publish_result(fingerprints[i], dedupe_window_minutes * 60)
+                    if cached:
+                        lines[i] = f"視頻 {i + 1} {cached['result']}（相同內容已於 {dedupe_window_minutes} 分鐘內發布，未重複發文）"
+                        succeeded.add(i)
+                        continue
+
+                if self._is_url(path):
+                    print(f"檢測到網路網址: {path}")
+                    video_url = path
+                else:
+                    print(f"檢測到本地路徑: {path}")
+                    video_url = self._process_local_video(path, base_url)
+
+                if not video_url or not self._is_url(video_url):
+                    lines[i] = f"視頻 {i + 1} 錯誤: 無法生成有效的視頻網址 ({path})"
+                    continue
+
+                jobs.append((i, video_url, caption))
+
+            # 步驟 1: 一次創建所有視頻媒體容器
+            def create(job):
+                i, video_url, caption = job
+                try:
+                    media = threads_api.create_media_container(
+                        text=caption,
+                        media_type="VIDEO",
+                        video_url=video_url
+                    )
+                    return i, media["id"], None
+                except Exception as e:
+                    return i, None, str(e)
+
+            media_index = {}
+            if jobs:
+                print(f"正在創建 {len(jobs)} 個視頻媒體容器...")
+                with ThreadPoolExecutor(max_workers=min(len(jobs), MAX_CONCURRENT_REQUESTS)) as executor:
+                    for i, media_id, error in executor.map(create, jobs):
+                        if media_id:
+                            print(f"視頻 {i + 1} 媒體容器已創建，ID: {media_id}")
+                            media_index[media_id] = i
+                        else:
+                            lines[i] = f"視頻 {i + 1} 錯誤: 創建媒體容器失敗 - {error}"
+
+            # 步驟 2: 共用輪詢，容器完成後立即發布
+            username = None
+
+            def publish(media_id):
+                nonlocal username
+                i = media_index[media_id]
+                try:
+                    print(f"正在發布視頻 {i + 1}...")
+                    result = threads_api.publish_container(media_id)
+                except Exception as e:
+                    lines[i] = f"視頻 {i + 1} 錯誤: 發布失敗 - {str(e)}"
+                    return
+
+                # 貼文已發布，先記錄結果，後續錯誤不會導致重複發文
+                succeeded.add(i)
+                message = f"發送成功！貼文 ID: {result['id']}"
+                try:
+                    if username is None:
+                        username = threads_api.get_user_bio().get("username", "")
+                    message = f"發送成功！貼文網址: https://www.threads.net/@{username}/post/{result['id']}"
+                except Exception as e:
+                    print(f"無法取得用戶名稱: {str(e)}")
+                if dedupe_window_minutes > 0:
+                    save_publish_result(fingerprints[i], message, [result['id']])
+                lines[i] = f"視頻 {i + 1} {message}"
+
+            if media_index:
+                statuses = threads_api.wait_for_containers(list(media_index), on_finished=publish)
+                for media_id, (status, error_message) in statuses.items():
+                    if status != "FINISHED":
+                        lines[media_index[media_id]] = f"視頻 {media_index[media_id] + 1} 錯誤: 媒體容器處理失敗 - {error_message}"
+
+            summary = f"批次視頻發送完成: {len(succeeded)}/{len(paths)} 成功"
+            return ("\n".join([summary] + lines),)
+
+        except Exception as e:
+            print(f"批次視頻發布錯誤: {str(e)}")
+            import traceback
+            traceback.print_exc()
+            return (f"錯誤: {str(e)}",)
+
+    def _split_captions(self, captions):
+        """以單獨一行的 "---" 分隔每個視頻的文字"""
+        if not captions.strip():
+            return []
+        parts = []
+        current = []
+        for line in captions.split('\n'):
+            if line.strip() == "---":
+                parts.append("\n".join(current).strip())
+                current = []
             else:
-                print(f"狀態檢查 API 錯誤: {resp.status_code} - {resp.text}")
-                return None
-                
+                current.append(line)
+        parts.append("\n".join(current).strip())
+        return parts
+
+
+class ThreadPublishCarousel(PublishThread, ThreadPublishVideo):
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {
+            "required": {
+                "text": ("STRING", {"multiline": True, "default": ""}),
+            },
+            "optional": {
+                "ComfyUIHttpsURL": ("STRING", {"multiline": False, "default": ""}),
+                "image": ("IMAGE",),
+                "image_url": ("STRING", {"multiline": True, "default": ""}),
+                "video_paths": ("STRING", {"multiline": True, "default": ""}),
+                "url_check": (["validate", "validate_and_rehost", "off"], {"default": "validate"}),
+                "dedupe_window_minutes": ("INT", {"default": 10, "min": 0, "max": 10080, "step": 1}),
+            }
+        }
+
+    RETURN_TYPES = ("STRING",)
+    RETURN_NAMES = ("result",)
+    FUNCTION = "publish_carousel"
+    CATEGORY = "ComfyUI-Thread"
+
+    def publish_carousel(self, text, ComfyUIHttpsURL="", image=None, image_url="", video_paths="", url_check="validate",
+                         dedupe_window_minutes=10):
+        fingerprint = fingerprint_inputs(
+            node="ThreadPublishCarousel", user_id=get_configured_user_id(), text=text, image=image, image_url=image_url, video_paths=video_paths
+        )
+        return publish_once(
+            fingerprint,
+            dedupe_window_minutes,
+            lambda record, _previous: self._publish_carousel(text, ComfyUIHttpsURL, image, image_url, video_paths, url_check, record),
+        )
+
+    def _publish_carousel(self, text, ComfyUIHttpsURL="", image=None, image_url="", video_paths="", url_check="validate",
+                          record=None):
+        try:
+            # 讀取配置
+            if not os.path.exists(CONFIG_FILE):
+                return ("錯誤: 請先執行 StartWithLongLiveToken 節點",)
+
+            with open(CONFIG_FILE, 'r', encoding='utf-8') as f:
+                config = json.load(f)
+
+            threads_api = ThreadsAPI(
+                config["USER_ID"],
+                config["ACCESS_TOKEN"],
+                config["APP_SECRET"]
+            )
+
+            # 處理 ComfyUI URL 配置
+            base_url = load_base_url()
+            if ComfyUIHttpsURL.strip():
+                # 更新 base URL
+                base_url = ComfyUIHttpsURL.strip()
+                save_base_url(base_url)
+                print(f"更新基礎網址為: {base_url}")
+
+            print(f"使用基礎網址: {base_url}")
+
+            media_items, error = self._collect_media_items(
+                base_url, image, image_url, video_paths, url_check,
+                min_items=CAROUSEL_MIN_ITEMS, max_items=CAROUSEL_MAX_ITEMS
+            )
+            if error:
+                return (error,)
+
+            carousel = threads_api.create_mixed_carousel_container(media_items, text)
+            print(f"輪播容器 ID: {carousel['id']}")
+            result = threads_api.publish_container(carousel["id"])
+
+            # 貼文已發布，先記錄結果，後續錯誤不會導致重複發文
+            thread_id = result["id"]
+            if record:
+                record(f"輪播發送成功！貼文 ID: {thread_id}", [thread_id])
+
+            # 取得用戶名稱來組合網址
+            user_info = threads_api.get_user_bio()
+            username = user_info.get("username", "")
+
+            post_url = f"https://www.threads.net/@{username}/post/{thread_id}"
+
+            message = f"輪播發送成功！貼文網址: {post_url}"
+            if record:
+                record(message)
+            return (message,)
+
         except Exception as e:
-            print(f"檢查媒體狀態時發生錯誤: {str(e)}")
-            return None
+            print(f"輪播發布錯誤: {str(e)}")
+            import traceback
+            traceback.print_exc()
+            return (f"錯誤: {str(e)}",)
+
+    def _collect_media_items(self, base_url, image, image_url, video_paths, url_check, min_items=0, max_items=CAROUSEL_MAX_ITEMS):
+        """收集圖片張量、圖片網址與視頻為 [(media_type, url), ...]，回傳 (項目列表, 錯誤訊息)"""
+        urls = [u.strip() for u in image_url.split('\n') if u.strip()]
+        videos = [p.strip() for p in video_paths.split('\n') if p.strip()]
+
+        # 先檢查項目數量，避免處理到一半才失敗
+        image_count = 0
+        if image is not None:
+            image_count = image.shape[0] if isinstance(image, torch.Tensor) and image.dim() == 4 else 1
+        total_count = image_count + len(urls) + len(videos)
+        if total_count < min_items or total_count > max_items:
+            return None, f"錯誤: 媒體項目數量必須介於 {min_items} 到 {max_items} 之間，目前為 {total_count}"
+
+        for url in urls:
+            if not self._is_url(url):
+                return None, f"錯誤: 無效的圖片網址: {url}"
+
+        # 在處理媒體與創建容器前並行檢查所有外部網址
+        if url_check != "off":
+            urls, url_errors = prevalidate_image_urls(
+                urls, base_url, rehost=(url_check == "validate_and_rehost")
+            )
+            if url_errors:
+                return None, "錯誤: 圖片網址檢查失敗\n" + "\n".join(url_errors)
+
+        # 收集所有輪播項目，依圖片、圖片網址、視頻的順序排列
+        media_items = []
+
+        if image is not None:
+            img_result = self._process_image(image, base_url)
+            if isinstance(img_result, list):
+                media_items.extend(("IMAGE", url) for url in img_result)
+            elif img_result:
+                media_items.append(("IMAGE", img_result))
+
+        media_items.extend(("IMAGE", url) for url in urls)
+
+        for path in videos:
+            if self._is_url(path):
+                print(f"檢測到網路網址: {path}")
+                video_url = path
+            else:
+                print(f"檢測到本地路徑: {path}")
+                video_url = self._process_local_video(path, base_url)
+                if not video_url:
+                    return None, f"錯誤: 無法處理本地視頻文件: {path}"
+            media_items.append(("VIDEO", video_url))
+
+        if len(media_items) != total_count:
+            return None, f"錯誤: 部分媒體項目處理失敗，成功 {len(media_items)}/{total_count} 個"
+
+        return media_items, None
+
+
+class ThreadScheduleThread(ThreadPublishCarousel):
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {
+            "required": {
+                "text": ("STRING", {"multiline": True, "default": ""}),
+                "schedule_mode": (["next_free_slot", "at_time"], {"default": "next_free_slot"}),
+                "scheduled_time": ("STRING", {"multiline": False, "default": ""}),
+                "min_interval_minutes": ("INT", {"default": 5, "min": 0, "max": 1440, "step": 1}),
+            },
+            "optional": {
+                "ComfyUIHttpsURL": ("STRING", {"multiline": False, "default": ""}),
+                "image": ("IMAGE",),
+                "image_url": ("STRING", {"multiline": True, "default": ""}),
+                "video_paths": ("STRING", {"multiline": True, "default": ""}),
+                "url_check": (["validate", "validate_and_rehost", "off"], {"default": "validate"}),
+            }
+        }
+
+    RETURN_TYPES = ("STRING",)
+    RETURN_NAMES = ("result",)
+    FUNCTION = "schedule_thread"
+    CATEGORY = "ComfyUI-Thread"
+
+    def schedule_thread(self, text, schedule_mode, scheduled_time, min_interval_minutes,
+                        ComfyUIHttpsURL="", image=None, image_url="", video_paths="", url_check="validate"):
+        try:
+            # 讀取配置
+            if not os.path.exists(CONFIG_FILE):
+                return ("錯誤: 請先執行 StartWithLongLiveToken 節點",)
+
+            with open(CONFIG_FILE, 'r', encoding='utf-8') as f:
+                config = json.load(f)
+
+            # 解析指定發文時間（本地時間）
+            due_at = None
+            if schedule_mode == "at_time":
+                try:
+                    due_at = datetime.strptime(scheduled_time.strip(), "%Y-%m-%d %H:%M").timestamp()
+                except ValueError:
+                    return ("錯誤: 發文時間格式應為 YYYY-MM-DD HH:MM",)
+
+            # 處理 ComfyUI URL 配置
+            base_url = load_base_url()
+            if ComfyUIHttpsURL.strip():
+                # 更新 base URL
+                base_url = ComfyUIHttpsURL.strip()
+                save_base_url(base_url)
+                print(f"更新基礎網址為: {base_url}")
+
+            print(f"使用基礎網址: {base_url}")
+
+            # 媒體在排程時即先準備好，發布時只需創建容器
+            media_items, error = self._collect_media_items(
+                base_url, image, image_url, video_paths, url_check
+            )
+            if error:
+                return (error,)
+
+            scheduler = get_scheduler()
+            schedule_id, due_at = scheduler.submit(
+                config["USER_ID"],
+                text,
+                media_items,
+                due_at=due_at,
+                min_interval=min_interval_minutes * 60,
+            )
+
+            due_time = datetime.fromtimestamp(due_at).strftime('%Y-%m-%d %H:%M:%S')
+            pending = scheduler.pending_count(config["USER_ID"])
+            return (f"排程成功！排程 ID: {schedule_id}，預計發文時間: {due_time}，待發布數量: {pending}",)
+
+        except Exception as e:
+            print(f"排程發文錯誤: {str(e)}")
+            import traceback
+            traceback.print_exc()
+            return (f"錯誤: {str(e)}",)
+
+
+class ThreadPublishReplyChain(ThreadPublishCarousel):
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {
+            "required": {
+                "text": ("STRING", {"multiline": True, "default": ""}),
+                "add_part_numbers": ("BOOLEAN", {"default": True}),
+                "media_parts": ("STRING", {"multiline": False, "default": "1"}),
+            },
+            "optional": {
+                "ComfyUIHttpsURL": ("STRING", {"multiline": False, "default": ""}),
+                "image": ("IMAGE",),
+                "image_url": ("STRING", {"multiline": True, "default": ""}),
+                "video_paths": ("STRING", {"multiline": True, "default": ""}),
+                "url_check": (["validate", "validate_and_rehost", "off"], {"default": "validate"}),
+                "dedupe_window_minutes": ("INT", {"default": 10, "min": 0, "max": 10080, "step": 1}),
+            }
+        }
+
+    RETURN_TYPES = ("STRING",)
+    RETURN_NAMES = ("result",)
+    FUNCTION = "publish_reply_chain"
+    CATEGORY = "ComfyUI-Thread"
+
+    def publish_reply_chain(self, text, add_part_numbers, media_parts,
+                            ComfyUIHttpsURL="", image=None, image_url="", video_paths="", url_check="validate",
+                            dedupe_window_minutes=10):
+        fingerprint = fingerprint_inputs(
+            node="ThreadPublishReplyChain", user_id=get_configured_user_id(), text=text,
+            add_part_numbers=add_part_numbers, media_parts=media_parts,
+            image=image, image_url=image_url, video_paths=video_paths
+        )
+        return publish_once(
+            fingerprint,
+            dedupe_window_minutes,
+            lambda record, previous: self._publish_reply_chain(
+                text, add_part_numbers, media_parts, ComfyUIHttpsURL, image, image_url, video_paths, url_check,
+                record, previous
+            ),
+        )
+
+    def _publish_reply_chain(self, text, add_part_numbers, media_parts,
+                             ComfyUIHttpsURL="", image=None, image_url="", video_paths="", url_check="validate",
+                             record=None, previous=None):
+        try:
+            # 讀取配置
+            if not os.path.exists(CONFIG_FILE):
+                return ("錯誤: 請先執行 StartWithLongLiveToken 節點",)
+
+            with open(CONFIG_FILE, 'r', encoding='utf-8') as f:
+                config = json.load(f)
+
+            threads_api = ThreadsAPI(
+                config["USER_ID"],
+                config["ACCESS_TOKEN"],
+                config["APP_SECRET"]
+            )
+
+            texts = split_text_into_parts(text, THREADS_TEXT_LIMIT, add_part_numbers)
+            if not texts:
+                return ("錯誤: 請提供貼文內容",)
+            print(f"文字已切分為 {len(texts)} 段")
+
+            # 解析要附加媒體的段落編號，例如 "1" 或 "1,3"
+            try:
+                part_numbers = [int(p) for p in media_parts.replace("，", ",").split(",") if p.strip()]
+            except ValueError:
+                return (f"錯誤: 無效的媒體段落編號: {media_parts}",)
+            for number in part_numbers:
+                if number < 1 or number > len(texts):
+                    return (f"錯誤: 媒體段落編號 {number} 超出範圍 (共 {len(texts)} 段)",)
+
+            # 處理 ComfyUI URL 配置
+            base_url = load_base_url()
+            if ComfyUIHttpsURL.strip():
+                # 更新 base URL
+                base_url = ComfyUIHttpsURL.strip()
+                save_base_url(base_url)
+                print(f"更新基礎網址為: {base_url}")
+
+            print(f"使用基礎網址: {base_url}")
+
+            media_items, error = self._collect_media_items(
+                base_url, image, image_url, video_paths, url_check,
+                max_items=CAROUSEL_MAX_ITEMS * max(len(part_numbers), 1)
+            )
+            if error:
+                return (error,)
+            if media_items and not part_numbers:
+                return ("錯誤: 請在 media_parts 指定要附加媒體的段落",)
+
+            # 媒體依序平均分配到指定段落
+            part_media = [[] for _ in texts]
+            if media_items:
+                chunk_count = len(part_numbers)
+                base_size, extra = divmod(len(media_items), chunk_count)
+                position = 0
+                for i, number in enumerate(part_numbers):
+                    size = base_size + (1 if i < extra else 0)
+                    part_media[number - 1].extend(media_items[position:position + size])
+                    position += size
+                for number, items in enumerate(part_media, 1):
+                    if len(items) > CAROUSEL_MAX_ITEMS:
+                        return (f"錯誤: 第 {number} 段媒體數量超過 {CAROUSEL_MAX_ITEMS} 個",)
+
+            # 上次執行中途失敗時，從最後一則已發布的貼文接續發布剩下的段落
+            published_ids = (previous or {}).get("post_ids") or []
+            if len(published_ids) >= len(texts):
+                published_ids = []
+            if published_ids:
+                print(f"時間窗口內已發布 {len(published_ids)}/{len(texts)} 段，從第 {len(published_ids) + 1} 段接續發布")
+
+            # 每段發布後即記錄進度與貼文 ID，中途失敗時重新執行也不會重複發文
+            def on_published(post_ids):
+                if record:
+                    record(
+                        f"串文已發布 {len(post_ids)}/{len(texts)} 段，第一則貼文 ID: {post_ids[0]}",
+                        post_ids, len(post_ids) == len(texts)
+                    )
+
+            post_ids = threads_api.publish_reply_chain(list(zip(texts, part_media)), on_published, published_ids)
+
+            # 取得用戶名稱來組合網址
+            user_info = threads_api.get_user_bio()
+            username = user_info.get("username", "")
+
+            post_url = f"https://www.threads.net/@{username}/post/{post_ids[0]}"
+
+            message = f"串文發送成功！共 {len(post_ids)} 段，貼文網址: {post_url}"
+            if record:
+                record(message, post_ids)
+            return (message,)
+
+        except Exception as e:
+            print(f"串文發布錯誤: {str(e)}")
+            import traceback
+            traceback.print_exc()
+            return (f"錯誤: {str(e)}",)
+
+
+# ComfyUI 啟動時恢復先前未完成的排程
+if os.path.exists(SCHEDULE_DB_FILE):
+    get_scheduler().start()
 
 
 NODE_CLASS_MAPPINGS = {
@@ -778,6 +2288,10 @@ NODE_CLASS_MAPPINGS = {
     "PublishThread": PublishThread,
     "ThreadsHistory": ThreadsHistory,
     "ThreadPublishVideo": ThreadPublishVideo,  
+    "ThreadPublishVideoBatch": ThreadPublishVideoBatch,
+    "ThreadPublishCarousel": ThreadPublishCarousel,
+    "ThreadScheduleThread": ThreadScheduleThread,
+    "ThreadPublishReplyChain": ThreadPublishReplyChain,
 }
 
 NODE_DISPLAY_NAME_MAPPINGS = {
@@ -785,4 +2299,8 @@ NODE_DISPLAY_NAME_MAPPINGS = {
     "PublishThread": "Publish Thread",
     "ThreadsHistory": "Threads History",
     "ThreadPublishVideo": "Thread Publish Video",  
+    "ThreadPublishVideoBatch": "Thread Publish Video Batch",
+    "ThreadPublishCarousel": "Thread Publish Carousel",
+    "ThreadScheduleThread": "Thread Schedule Thread",
+    "ThreadPublishReplyChain": "Thread Publish Reply Chain",
 }
\ No newline at end of file